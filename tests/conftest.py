@@ -0,0 +1,24 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+APP_FILE = Path(__file__).resolve().parent.parent / "timer_app_streamlit2.py"
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # the app keeps its data files next to the working directory and reads st.secrets
+    workdir = tmp_path_factory.mktemp("app")
+    (workdir / ".streamlit").mkdir()
+    (workdir / ".streamlit" / "secrets.toml").write_text("API_PORT = 0\n", encoding="utf-8")
+    old_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    spec = importlib.util.spec_from_file_location("timer_app", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+
+    os.chdir(old_cwd)
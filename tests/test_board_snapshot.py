@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+BOARD = [
+    ["Venatus", 600, "2026-03-02 08:00 AM", 3],
+    ["Viorent", 600, "2026-03-02 08:00 AM", 1],
+]
+
+
+def test_publish_refuses_what_it_cannot_hold(app, tmp_path):
+    snapshot = app.BoardSnapshot(tmp_path / "board.bin", capacity=2)
+    with snapshot.locked():
+        seq = snapshot.publish(BOARD)
+
+        with pytest.raises(ValueError):
+            snapshot.publish(BOARD + [["Ego", 1260, "2026-03-02 08:00 AM", 0]])
+        with pytest.raises(ValueError):
+            snapshot.publish([["Ω" * 25, 600, "2026-03-02 08:00 AM", 0]])  # 50 bytes of utf-8
+
+    assert snapshot.version() == seq
+    assert snapshot.read()[1] == BOARD
+
+
+def test_flush_writes_local_rows_upgraded_by_newer_snapshot_records(app, tmp_path, monkeypatch):
+    data_file = tmp_path / "boss_timers.json"
+    monkeypatch.setattr(app, "DATA_FILE", data_file)
+    snapshot = app.BoardSnapshot(tmp_path / "board.bin")
+    writer = app.WriteBehindWriter(coalesce_seconds=60, snapshot=snapshot)
+
+    # another process committed Viorent after this one queued its board
+    with snapshot.locked():
+        snapshot.publish([BOARD[0][:3] + [2], ["Viorent", 600, "2026-03-02 09:00 AM", 2]])
+    writer.submit(board=BOARD)
+    assert writer.flush()
+
+    assert json.loads(data_file.read_text(encoding="utf-8")) == [
+        ["Venatus", 600, "2026-03-02 08:00 AM", 3],
+        ["Viorent", 600, "2026-03-02 09:00 AM", 2],
+    ]
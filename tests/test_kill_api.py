@@ -0,0 +1,136 @@
+import http.client
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+import requests
+
+MANILA = ZoneInfo("Asia/Manila")
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def fake_webhook():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/webhook", received
+    server.shutdown()
+
+
+def _post_to(webhook_url: str, payload: dict) -> bool:
+    # stands in for _post_webhook, which only talks to discord.com
+    return requests.post(webhook_url, json=payload, timeout=5).ok
+
+
+def _ingestor(app, webhook_url: str, keys_file: Path):
+    return app.KillIngestor(post=_post_to, targets=[{"name": "fake", "webhook": webhook_url}], keys_file=keys_file)
+
+
+@pytest.fixture
+def api(app, fake_webhook, tmp_path):
+    url, _ = fake_webhook
+    server = app.start_api(_ingestor(app, url, tmp_path / "kill_keys.json"), app.CalendarFeed(), port=0,
+                           token=TOKEN)
+    yield server
+    server.shutdown()
+
+
+def _kills_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_port}/kills"
+
+
+def _post(server, payload):
+    return requests.post(_kills_url(server), json=payload, headers={"Authorization": f"Bearer {TOKEN}"}, timeout=5)
+
+
+def _ago(**kwargs) -> str:
+    return (datetime.now(tz=MANILA) - timedelta(**kwargs)).isoformat()
+
+
+def test_batch_is_applied_once_and_retries_are_deduped(app, api, fake_webhook):
+    _, received = fake_webhook
+    batch = {"kills": [
+        {"boss": "Venatus", "killed_at": _ago(hours=1), "reporter": "scout", "idempotency_key": "batch-1"},
+        {"boss": "Ego", "killed_at": _ago(hours=1), "reporter": "bot", "idempotency_key": "batch-2"},
+        {"boss": "Nope", "idempotency_key": "batch-3"},
+        {"boss": ["Ego"], "idempotency_key": "batch-4"},
+    ]}
+
+    body = _post(api, batch).json()
+    assert [a["boss"] for a in body["applied"]] == ["Venatus", "Ego"]
+    assert {r["idempotency_key"] for r in body["rejected"]} == {"batch-3", "batch-4"}
+
+    # one combined notification for the whole batch
+    assert len(received) == 1
+    assert "**Venatus**" in received[0]["content"] and "**Ego**" in received[0]["content"]
+
+    retry = _post(api, batch).json()
+    assert retry["applied"] == []
+    assert retry["duplicates"] == ["batch-1", "batch-2"]
+    assert len(received) == 1
+
+    app.get_writer().flush()
+    history = json.loads(Path("boss_history.json").read_text(encoding="utf-8"))
+    assert [h["edited_by"] for h in history[-2:]] == ["scout", "bot"]
+
+
+def test_older_report_does_not_roll_boss_back(app, api, fake_webhook):
+    _, received = fake_webhook
+    _post(api, [{"boss": "Viorent", "killed_at": _ago(minutes=30), "idempotency_key": "late-1"}])
+    body = _post(api, [{"boss": "Viorent", "killed_at": _ago(days=200), "idempotency_key": "late-2"}]).json()
+
+    assert body["applied"] == []
+    assert body["rejected"][0]["idempotency_key"] == "late-2"
+    assert len(received) == 1
+    row = next(r for r in app.get_board_store().rows() if r[0] == "Viorent")
+    last_time = datetime.strptime(row[2], "%Y-%m-%d %I:%M %p").replace(tzinfo=MANILA)
+    assert last_time > datetime.now(tz=MANILA) - timedelta(days=1)
+
+
+def test_seen_keys_survive_a_restart(app, fake_webhook, tmp_path):
+    url, _ = fake_webhook
+    keys_file = tmp_path / "kill_keys.json"
+    report = {"boss": "Titore", "killed_at": _ago(minutes=1), "idempotency_key": "restart-1"}
+
+    first = _ingestor(app, url, keys_file).ingest([report])
+    assert [a["idempotency_key"] for a in first["applied"]] == ["restart-1"]
+
+    restarted = _ingestor(app, url, keys_file).ingest([report])
+    assert restarted["duplicates"] == ["restart-1"]
+
+
+@pytest.mark.parametrize("length, status", [("-1", 400), (str(10 * 1024 * 1024), 413)])
+def test_bad_content_length_is_refused(api, length, status):
+    conn = http.client.HTTPConnection("127.0.0.1", api.server_port, timeout=5)
+    conn.putrequest("POST", "/kills")
+    conn.putheader("Authorization", f"Bearer {TOKEN}")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    assert conn.getresponse().status == status
+
+
+def test_kills_are_refused_without_a_token(app, fake_webhook, tmp_path):
+    url, received = fake_webhook
+    server = app.start_api(_ingestor(app, url, tmp_path / "kill_keys.json"), app.CalendarFeed(), port=0, token="")
+    try:
+        resp = requests.post(_kills_url(server), json=[{"boss": "Livera", "idempotency_key": "open-1"}], timeout=5)
+        assert resp.status_code == 403
+        assert requests.get(f"http://127.0.0.1:{server.server_port}/calendar.ics", timeout=5).status_code == 200
+    finally:
+        server.shutdown()
+    assert received == []
@@ -0,0 +1,27 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+START = datetime(2026, 3, 2, 8, 0, tzinfo=ZoneInfo("Asia/Manila"))
+
+
+def _field_timers(app):
+    return [app.TimerEntry(*row) for row in app.default_boss_data]
+
+
+def test_every_spawn_warned_exactly_once_over_30_days(app):
+    report = app.simulate_schedule(days=30, start=START, field_timers=_field_timers(app))
+
+    assert report["spawns"] > 0
+    assert report["flagged_bosses"] == []
+    assert report["missing"] == []
+    assert report["duplicates"] == {}
+    assert report["messages"] == report["warnings"] * len(app.DISCORD_TARGETS)
+
+
+def test_broken_claim_save_shows_up_as_duplicates(app, monkeypatch):
+    monkeypatch.setattr(app, "save_warn_sent", lambda *args, **kwargs: None)
+
+    report = app.simulate_schedule(days=3, start=START, field_timers=_field_timers(app))
+
+    assert report["duplicates"]
+    assert report["flagged_bosses"]
@@ -1,5 +1,5 @@
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from streamlit_autorefresh import st_autorefresh
 import pandas as pd
@@ -7,6 +7,33 @@ import requests
 import json
 from pathlib import Path
 import time
+import copy
+import sys
+import os
+import tempfile
+import threading
+import atexit
+import hashlib
+import mmap
+import marshal
+import cProfile
+import pstats
+import struct
+import warnings
+from contextlib import contextmanager, nullcontext
+from email.utils import format_datetime, parsedate_to_datetime
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fcntl  # cross-process lock for snapshot writers (not available on Windows)
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt  # Windows stand-in for fcntl
+except ImportError:
+    msvcrt = None
 
 # ------------------- Config -------------------
 MANILA = ZoneInfo("Asia/Manila")
@@ -14,9 +41,31 @@ MANILA = ZoneInfo("Asia/Manila")
 DATA_FILE = Path("boss_timers.json")
 HISTORY_FILE = Path("boss_history.json")
 WARN_FILE = Path("warn_sent.json")
+KILL_KEYS_FILE = Path("kill_keys.json")  # idempotency keys already applied by the kill API
+SNAPSHOT_FILE = Path("boss_timers.bin")  # mmap'd board shared by every server process
+SNAPSHOT_CAPACITY = 256  # max bosses the fixed-size snapshot can hold
 
 ADMIN_PASSWORD = st.secrets.get("ADMIN_PASSWORD", "bestgame")
 WARNING_WINDOW_SECONDS = 5 * 60  # 5 minutes
+WRITE_COALESCE_SECONDS = 0.2  # edits landing inside this window share one disk write
+
+# Local HTTP API (kill reports + calendar feed). Set API_PORT = 0 in secrets to disable.
+# KILL_API_PORT is the older name of the same setting and is still honoured.
+# POST /kills stays disabled (403) until KILL_API_TOKEN is set. Only /calendar.ics is
+# meant to be reverse-proxied; keep /kills on the loopback listener for your bots.
+API_HOST = "127.0.0.1"
+API_PORT = int(st.secrets.get("API_PORT", st.secrets.get("KILL_API_PORT", 8765)))
+KILL_API_TOKEN = st.secrets.get("KILL_API_TOKEN", "")
+KILL_API_MAX_BODY = 1024 * 1024  # bytes per POST /kills batch
+
+# Public URL of /calendar.ics (proxy only that path), shown on the World page
+CALENDAR_FEED_URL = st.secrets.get("CALENDAR_FEED_URL", "")
+CALENDAR_HORIZON_DAYS = 14
+
+PROFILE_RING_SIZE = 50  # most recent profiled reruns kept for the Profiler page
+# From Python 3.12 cProfile records every thread, so a capture holds whatever the whole
+# server ran during that rerun, not just that session's script
+PROFILE_SERVER_WIDE = sys.version_info >= (3, 12)
 
 # ------------------- Discord (TWO TARGETS) -------------------
 DISCORD_TARGETS = [
@@ -56,6 +105,21 @@ def _post_webhook(webhook_url: str, payload: dict) -> bool:
         return False
 
 
+def _chunk_message(parts: list, limit: int = 2000) -> list:
+    """Join message parts with blank lines, splitting only where Discord's length limit forces it."""
+    chunks = []
+    current = ""
+    for part in parts:
+        candidate = f"{current}\n\n{part}" if current else part
+        if current and len(candidate) > limit:
+            chunks.append(current)
+            candidate = part
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 def send_discord_message_per_target(message_builder) -> dict:
     """
     message_builder: function(target_dict) -> message_str
@@ -69,9 +133,44 @@ def send_discord_message_per_target(message_builder) -> dict:
     return results
 
 
+# ------------------- Clock -------------------
+class SystemClock:
+    """Wall clock in Manila time (the default)."""
+
+    def now(self) -> datetime:
+        return datetime.now(tz=MANILA)
+
+
+class SimulatedClock:
+    """Manually advanced clock used by the schedule simulator."""
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def set(self, dt: datetime):
+        self.current = dt
+
+
+_clock = SystemClock()
+
+
+def set_clock(clock):
+    """
+    Swap the process-wide clock used by now_manila().
+    Returns the previous clock so callers can restore it.
+    """
+    global _clock
+    previous = _clock
+    _clock = clock
+    return previous
+
+
 # ------------------- Helpers -------------------
 def now_manila() -> datetime:
-    return datetime.now(tz=MANILA)
+    return _clock.now()
 
 
 def format_timedelta(td: timedelta) -> str:
@@ -120,7 +219,139 @@ default_boss_data = [
 
 
 # ------------------- JSON Persistence -------------------
+def _atomic_write_json(path: Path, obj, indent: int) -> None:
+    # temp file + fsync + rename so readers never see a half-written file
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WriteBehindWriter:
+    """
+    Background writer shared by every session.
+    submit() only queues the mutation; the writer thread waits WRITE_COALESCE_SECONDS
+    so a burst of edits collapses into one board write and one history append.
+    With a BoardSnapshot, writes happen under its cross-process lock and any record
+    another process has since committed a newer version of is taken from the snapshot,
+    so an older local copy never overwrites it.
+    """
+
+    def __init__(self, coalesce_seconds: float = WRITE_COALESCE_SECONDS, snapshot: "BoardSnapshot" = None):
+        self.coalesce_seconds = coalesce_seconds
+        self.snapshot = snapshot
+        self.last_error = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._board = None  # latest full board, last one wins
+        self._history = []  # history entries waiting to be appended
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, board=None, history_entry=None, history_entries=None):
+        with self._cond:
+            if board is not None:
+                self._board = board
+            if history_entry is not None:
+                self._history.append(history_entry)
+            if history_entries:
+                self._history.extend(history_entries)
+            self._cond.notify()
+
+    def pending_board(self):
+        with self._cond:
+            return self._board
+
+    def pending_history(self) -> list:
+        with self._cond:
+            return list(self._history)
+
+    def read_history(self) -> list:
+        """History on disk plus entries still queued, without a flush in between (no doubles)."""
+        with self._write_lock:
+            history = []
+            if HISTORY_FILE.exists():
+                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            return history + self.pending_history()
+
+    def is_pending(self) -> bool:
+        with self._cond:
+            return self._board is not None or bool(self._history)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._board is None and not self._history:
+                    self._cond.wait()
+            time.sleep(self.coalesce_seconds)
+            if not self.flush():
+                time.sleep(1.0)  # disk trouble, back off before retrying
+
+    def flush(self) -> bool:
+        """Write everything queued so far. Safe to call from any thread (and at exit)."""
+        with self._write_lock:
+            with self._cond:
+                board = self._board
+                history = self._history[:]
+
+            if board is None and not history:
+                return True
+
+            try:
+                with self.snapshot.locked() if self.snapshot is not None else nullcontext():
+                    if board is not None:
+                        rows = board
+                        if self.snapshot is not None:
+                            rows = _newer_records(board, self.snapshot.read()[1] or [])
+                        _atomic_write_json(DATA_FILE, rows, indent=4)
+                    if history:
+                        existing = []
+                        if HISTORY_FILE.exists():
+                            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+                                existing = json.load(f)
+                        _atomic_write_json(HISTORY_FILE, existing + history, indent=4)
+            except Exception as e:
+                self.last_error = str(e)
+                return False
+
+            self.last_error = None
+            with self._cond:
+                if self._board is board:
+                    self._board = None
+                del self._history[:len(history)]
+            return True
+
+
+def _newer_records(board, others):
+    """board with each record replaced by the same boss's record from others if that one has a higher version."""
+    newer = {record[0]: record for record in others}
+    return [
+        newer[record[0]] if record[0] in newer and newer[record[0]][3] > record[3] else record
+        for record in board
+    ]
+
+
+@st.cache_resource
+def get_writer() -> WriteBehindWriter:
+    writer = WriteBehindWriter(snapshot=get_snapshot())
+    atexit.register(writer.flush)
+    return writer
+
+
+def save_status() -> str:
+    writer = get_writer()
+    if writer.last_error:
+        return f"⚠️ Save failed, retrying: {writer.last_error}"
+    return "💾 Saving…" if writer.is_pending() else "💾 All changes saved"
+
+
 def load_boss_data():
+    pending = get_writer().pending_board()
+    if pending is not None:
+        return pending
     if DATA_FILE.exists():
         with open(DATA_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -129,15 +360,15 @@ def load_boss_data():
 
 
 def save_boss_data(data):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    get_writer().submit(board=data)
 
 
 # ------------------- Global Warn Storage -------------------
-def load_warn_sent() -> dict:
-    if WARN_FILE.exists():
+def load_warn_sent(path: Path = None) -> dict:
+    path = path or WARN_FILE
+    if path.exists():
         try:
-            with open(WARN_FILE, "r", encoding="utf-8") as f:
+            with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             return data if isinstance(data, dict) else {}
         except Exception:
@@ -145,47 +376,47 @@ def load_warn_sent() -> dict:
     return {}
 
 
-def save_warn_sent(warn_dict: dict) -> None:
+def save_warn_sent(warn_dict: dict, path: Path = None) -> None:
     # keep the file from growing forever
     if len(warn_dict) > 2000:
         warn_dict = dict(list(warn_dict.items())[-1500:])
 
-    with open(WARN_FILE, "w", encoding="utf-8") as f:
+    with open(path or WARN_FILE, "w", encoding="utf-8") as f:
         json.dump(warn_dict, f, indent=2)
 
 
 # ------------------- Edit History -------------------
-def log_edit(boss_name: str, old_time: str, new_time: str):
-    history = []
-    if HISTORY_FILE.exists():
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            history = json.load(f)
+def load_history() -> list:
+    return get_writer().read_history()
 
-    edited_by = st.session_state.get("username", "Unknown")
-    entry = {
+
+def _history_entry(boss_name: str, old_time: str, new_time: str, edited_by: str) -> dict:
+    return {
         "boss": boss_name,
         "old_time": old_time,
         "new_time": new_time,
         "edited_at": now_manila().strftime("%Y-%m-%d %I:%M %p"),
         "edited_by": edited_by,
     }
-    history.append(entry)
 
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=4)
+
+def log_edit(boss_name: str, old_time: str, new_time: str):
+    edited_by = st.session_state.get("username", "Unknown")
+    get_writer().submit(history_entry=_history_entry(boss_name, old_time, new_time, edited_by))
 
 
 # ------------------- Timer Class -------------------
 class TimerEntry:
-    def __init__(self, name: str, interval_minutes: int, last_time_str: str):
+    def __init__(self, name: str, interval_minutes: int, last_time_str: str, version: int = 0):
         self.name = name
+        self.version = int(version)
         self.interval_minutes = int(interval_minutes)
         self.interval_seconds = self.interval_minutes * 60
         self.last_time = datetime.strptime(last_time_str, "%Y-%m-%d %I:%M %p").replace(tzinfo=MANILA)
         self.next_time = self.last_time + timedelta(seconds=self.interval_seconds)
 
-    def update_next(self):
-        now = now_manila()
+    def update_next(self, now: datetime = None):
+        now = now or now_manila()
         while self.next_time < now:
             self.last_time = self.next_time
             self.next_time = self.last_time + timedelta(seconds=self.interval_seconds)
@@ -194,8 +425,528 @@ class TimerEntry:
         return self.next_time - now_manila()
 
 
+# ------------------- Binary Board Snapshot -------------------
+# Layout (little endian, fixed size):
+#   header  : magic, layout, seq (the version word), count
+#   records : name_id, interval_minutes, last_epoch, next_epoch, record_version
+#   names   : one fixed-width utf-8 slot per name_id
+# Writers update in place under a seqlock: seq is odd while a write is in progress.
+_SNAP_MAGIC = b"BTS1"
+_SNAP_HEADER = struct.Struct("<4sIQI")
+_SNAP_RECORD = struct.Struct("<IIqqI")
+_SNAP_NAME = struct.Struct("<48s")
+_SNAP_HEADER_SIZE = 32
+_SNAP_SEQ_OFFSET = 8
+_SNAP_LOCK_OFFSET = 1 << 30  # byte locked with msvcrt, past any real snapshot so reads never hit it
+
+
+class BoardSnapshot:
+    def __init__(self, path: Path = SNAPSHOT_FILE, capacity: int = SNAPSHOT_CAPACITY):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        # never O_TRUNC: other processes may have this file mapped
+        self._file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        slot = _SNAP_RECORD.size + _SNAP_NAME.size
+
+        with self.locked():
+            size = os.fstat(self._file.fileno()).st_size
+            self._file.seek(0)
+            header = self._file.read(_SNAP_HEADER.size)
+            live = (
+                size > _SNAP_HEADER_SIZE
+                and (size - _SNAP_HEADER_SIZE) % slot == 0
+                and _SNAP_HEADER.unpack_from(header)[:2] == (_SNAP_MAGIC, 1)
+            )
+            if live:
+                capacity = (size - _SNAP_HEADER_SIZE) // slot  # adopt the live snapshot's size
+            else:
+                # new file, or one a crashed process never finished setting up
+                size = _SNAP_HEADER_SIZE + capacity * slot
+                self._file.truncate(size)
+                self._file.seek(0)
+                self._file.write(_SNAP_HEADER.pack(_SNAP_MAGIC, 1, 0, 0))
+                self._file.flush()
+            self._mm = mmap.mmap(self._file.fileno(), size)
+
+        self.capacity = capacity
+        self._records_at = _SNAP_HEADER_SIZE
+        self._names_at = self._records_at + capacity * _SNAP_RECORD.size
+
+    def version(self) -> int:
+        return struct.unpack_from("<Q", self._mm, _SNAP_SEQ_OFFSET)[0]
+
+    @contextmanager
+    def locked(self):
+        """
+        Serialise writers across threads and processes. flock / msvcrt locks are per
+        open file, so threads of this process also need the thread lock. With neither
+        available only the thread lock applies (get_snapshot() won't share the file then).
+        """
+        with self._thread_lock:
+            self._lock_file()
+            try:
+                yield
+            finally:
+                self._unlock_file()
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            while True:
+                self._file.seek(_SNAP_LOCK_OFFSET)
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10s, keep waiting
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            self._file.seek(_SNAP_LOCK_OFFSET)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def read(self):
+        """
+        Returns (seq, rows) with rows as [name, interval, last_time_str, version],
+        or (seq, None) if a writer kept the snapshot busy.
+        """
+        mm = self._mm
+        for _ in range(100):
+            seq = self.version()
+            if seq % 2:
+                time.sleep(0)
+                continue
+            count = _SNAP_HEADER.unpack_from(mm, 0)[3]
+            raw = []
+            for i in range(count):
+                name_id, interval, last_epoch, _, version = _SNAP_RECORD.unpack_from(
+                    mm, self._records_at + i * _SNAP_RECORD.size
+                )
+                name = _SNAP_NAME.unpack_from(mm, self._names_at + name_id * _SNAP_NAME.size)[0]
+                raw.append((name, interval, last_epoch, version))
+            if self.version() != seq:
+                continue  # torn read, a writer got in between
+            rows = [
+                [
+                    name.rstrip(b"\0").decode("utf-8"),
+                    interval,
+                    datetime.fromtimestamp(last_epoch, tz=MANILA).strftime("%Y-%m-%d %I:%M %p"),
+                    version,
+                ]
+                for name, interval, last_epoch, version in raw
+            ]
+            return seq, rows
+        return self.version(), None
+
+    def publish(self, rows) -> int:
+        """
+        Write the board in place (caller holds locked()). Returns the new seq.
+        Raises ValueError, before touching the snapshot, if the board has more bosses
+        than the snapshot holds or a name does not fit its slot.
+        """
+        if len(rows) > self.capacity:
+            raise ValueError(f"board has {len(rows)} bosses, snapshot {self.path} holds {self.capacity}")
+        names = [row[0].encode("utf-8") for row in rows]
+        for row, name in zip(rows, names):
+            if len(name) > _SNAP_NAME.size:
+                raise ValueError(f"boss name {row[0]!r} is longer than {_SNAP_NAME.size} bytes of utf-8")
+
+        mm = self._mm
+        seq = self.version()
+        seq += 2 if seq % 2 == 0 else 1  # recover from a writer that died mid-write
+        struct.pack_into("<Q", mm, _SNAP_SEQ_OFFSET, seq - 1)
+        for i, row in enumerate(rows):
+            last_dt = datetime.strptime(row[2], "%Y-%m-%d %I:%M %p").replace(tzinfo=MANILA)
+            last_epoch = int(last_dt.timestamp())
+            _SNAP_RECORD.pack_into(
+                mm, self._records_at + i * _SNAP_RECORD.size,
+                i, int(row[1]), last_epoch, last_epoch + int(row[1]) * 60, int(row[3]),
+            )
+            _SNAP_NAME.pack_into(mm, self._names_at + i * _SNAP_NAME.size, names[i])
+        _SNAP_HEADER.pack_into(mm, 0, _SNAP_MAGIC, 1, seq - 1, len(rows))
+        struct.pack_into("<Q", mm, _SNAP_SEQ_OFFSET, seq)
+        return seq
+
+
+# ------------------- Shared Board (per-boss versions) -------------------
+class BoardStore:
+    """
+    Per-process copy of the board. Each record is [name, interval, last_time_str, version].
+    Edits are compare-and-swap on a single record, so admins editing different
+    bosses never overwrite each other and a stale edit on the same boss is rejected.
+    Commits are published to the BoardSnapshot so other server processes see them.
+    """
+
+    def __init__(self, rows, snapshot: BoardSnapshot = None):
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._order = []
+        self.version = 0  # bumps on every change this process sees, any boss
+        self.snapshot = snapshot
+        self._snapshot_seq = None
+        self._merge(rows)
+
+        if snapshot is not None:
+            with snapshot.locked():
+                seq, snap_rows = snapshot.read()
+                if snap_rows:
+                    self._merge(snap_rows)
+                self._snapshot_seq = snapshot.publish(self._rows_locked())
+
+    def _merge(self, rows):
+        """Take every record that is newer than ours (caller holds the lock or owns self)."""
+        for row in rows:
+            version = int(row[3]) if len(row) > 3 else 0
+            current = self._rows.get(row[0])
+            if current is None:
+                self._order.append(row[0])
+            elif current[3] >= version:
+                continue
+            self._rows[row[0]] = [row[0], int(row[1]), row[2], version]
+            self.version += 1
+
+    def _rows_locked(self) -> list:
+        return [list(self._rows[n]) for n in self._order]
+
+    def _refresh_locked(self):
+        if self.snapshot is None or self.snapshot.version() == self._snapshot_seq:
+            return
+        seq, snap_rows = self.snapshot.read()
+        if snap_rows is not None:
+            self._merge(snap_rows)
+            self._snapshot_seq = seq
+
+    def _commit_locked(self):
+        rows = self._rows_locked()
+        if self.snapshot is not None:
+            self._snapshot_seq = self.snapshot.publish(rows)
+        # submit under the lock so snapshots reach the writer in commit order
+        save_boss_data(rows)
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            if self.snapshot is None:
+                yield
+                return
+            with self.snapshot.locked():
+                self._refresh_locked()
+                yield
+
+    def refresh(self) -> int:
+        """Pick up commits from other processes. One word read when nothing changed."""
+        if self.snapshot is not None and self.snapshot.version() != self._snapshot_seq:
+            with self._lock:
+                self._refresh_locked()
+        return self.version
+
+    def rows(self) -> list:
+        with self._lock:
+            return self._rows_locked()
+
+    def compare_and_set(self, name: str, expected_version: int, last_time_str: str):
+        """
+        Returns (True, new_row) if the record was still at expected_version,
+        otherwise (False, current_row) and nothing is written.
+        """
+        with self._writing():
+            row = self._rows[name]
+            if row[3] != expected_version:
+                return False, list(row)
+
+            row[2] = last_time_str
+            row[3] += 1
+            self.version += 1
+            self._commit_locked()
+            return True, list(row)
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._rows
+
+    def apply_kills(self, kills) -> list:
+        """
+        kills: list of (name, last_time_str), applied in order as one commit.
+        A kill that is not newer than the record's last_time is skipped (late or
+        reordered report) so it can never roll a boss back.
+        Returns: list of (old_row, new_row), new_row is None for skipped kills
+        """
+        with self._writing():
+            results = []
+            for name, last_time_str in kills:
+                row = self._rows[name]
+                old = list(row)
+                new_last = datetime.strptime(last_time_str, "%Y-%m-%d %I:%M %p")
+                if new_last <= datetime.strptime(row[2], "%Y-%m-%d %I:%M %p"):
+                    results.append((old, None))
+                    continue
+                row[2] = last_time_str
+                row[3] += 1
+                self.version += 1
+                results.append((old, list(row)))
+            if any(new is not None for _, new in results):
+                self._commit_locked()
+            return results
+
+
+@st.cache_resource
+def get_snapshot() -> BoardSnapshot:
+    if fcntl is None and msvcrt is None:
+        # without a cross-process lock two servers could tear each other's writes
+        warnings.warn("no cross-process file lock on this platform, not sharing the board snapshot")
+        return None
+    return BoardSnapshot()
+
+
+@st.cache_resource
+def get_board_store() -> BoardStore:
+    return BoardStore(load_boss_data(), get_snapshot())
+
+
 def build_timers():
-    return [TimerEntry(*row) for row in load_boss_data()]
+    return [TimerEntry(*row) for row in get_board_store().rows()]
+
+
+def sync_timers(timers) -> int:
+    """
+    Replace any session timer whose record another admin changed.
+    Returns the board version the session is now in sync with.
+    """
+    store = get_board_store()
+    version = store.version
+    rows = {row[0]: row for row in store.rows()}
+    for i, t in enumerate(timers):
+        row = rows.get(t.name)
+        if row is not None and row[3] != t.version:
+            timers[i] = TimerEntry(*row)
+    return version
+
+
+# ------------------- Kill Report API -------------------
+def _kill_message(boss_name: str, next_time: datetime, updated_by: str) -> str:
+    spawn_str = next_time.strftime("%B %d, %Y | %I:%M %p")
+    return (
+        f"💀 **{boss_name}** has been killed.\n"
+        f"Next spawn: **{spawn_str}** (Manila Time)\n"
+        f"Updated by {updated_by}"
+    )
+
+
+def _parse_killed_at(value) -> datetime:
+    """Accepts ISO 8601 or the board's own format; missing means 'now'. Naive times are Manila."""
+    if not value:
+        return now_manila()
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        dt = datetime.strptime(value, "%Y-%m-%d %I:%M %p")
+    return dt.replace(tzinfo=MANILA) if dt.tzinfo is None else dt.astimezone(MANILA)
+
+
+class KillIngestor:
+    """
+    Applies batches of kill reports {boss, killed_at, reporter, idempotency_key}.
+    A batch costs one board write, one history append and one combined Discord
+    notification. Retries with an already-applied idempotency_key are skipped,
+    also across restarts (keys are kept in KILL_KEYS_FILE).
+    """
+
+    def __init__(self, post=None, targets=None, max_keys: int = 5000, keys_file: Path = None):
+        self.post = post or _post_webhook
+        self.targets = targets if targets is not None else DISCORD_TARGETS
+        self.max_keys = max_keys
+        self.keys_file = keys_file or KILL_KEYS_FILE
+        self._lock = threading.Lock()  # one batch at a time so dedupe + apply is atomic
+        self._seen = OrderedDict()  # idempotency_key -> True, oldest first
+
+        if self.keys_file.exists():
+            try:
+                with open(self.keys_file, "r", encoding="utf-8") as f:
+                    keys = json.load(f)
+                if isinstance(keys, list):
+                    self._seen.update((str(k), True) for k in keys)
+            except Exception:
+                pass
+
+    def ingest(self, reports: list) -> dict:
+        applied, duplicates, rejected = [], [], []
+
+        with self._lock:
+            store = get_board_store()
+            batch = []  # (key, name, killed_dt, reporter)
+            batch_keys = set()
+            for report in reports:
+                key = str(report.get("idempotency_key") or "") if isinstance(report, dict) else ""
+                if not key:
+                    rejected.append({"idempotency_key": None, "error": "missing idempotency_key"})
+                    continue
+                if key in self._seen or key in batch_keys:
+                    duplicates.append(key)
+                    continue
+
+                name = report.get("boss", "")
+                if not isinstance(name, str):
+                    rejected.append({"idempotency_key": key, "error": "boss must be a string"})
+                    continue
+                if not store.has(name):
+                    rejected.append({"idempotency_key": key, "error": f"unknown boss: {name}"})
+                    continue
+                try:
+                    killed_dt = _parse_killed_at(report.get("killed_at"))
+                except (TypeError, ValueError):
+                    rejected.append({"idempotency_key": key, "error": "bad killed_at"})
+                    continue
+                if killed_dt > now_manila() + timedelta(minutes=1):
+                    rejected.append({"idempotency_key": key, "error": "killed_at is in the future"})
+                    continue
+
+                batch_keys.add(key)
+                batch.append((key, name, killed_dt, str(report.get("reporter") or "API")))
+
+            results = store.apply_kills([
+                (name, killed_dt.strftime("%Y-%m-%d %I:%M %p")) for _, name, killed_dt, _ in batch
+            ])
+
+            history = []
+            message_parts = []
+            for (key, name, _, reporter), (old, new) in zip(batch, results):
+                if new is None:
+                    rejected.append({
+                        "idempotency_key": key,
+                        "error": f"killed_at is not newer than current last_time ({old[2]})",
+                    })
+                    continue
+                self._seen[key] = True
+                next_time = TimerEntry(*new).next_time
+                history.append(_history_entry(name, old[2], new[2], reporter))
+                message_parts.append(_kill_message(name, next_time, reporter))
+                applied.append({
+                    "idempotency_key": key,
+                    "boss": name,
+                    "last_time": new[2],
+                    "next_time": next_time.strftime("%Y-%m-%d %I:%M %p"),
+                    "version": new[3],
+                })
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+            if applied:
+                _atomic_write_json(self.keys_file, list(self._seen), indent=0)
+
+        if history:
+            get_writer().submit(history_entries=history)
+
+        # one combined notification per Discord target (split only past the length limit)
+        for chunk in _chunk_message(message_parts):
+            for target in self.targets:
+                self.post(target.get("webhook", ""), {"content": chunk})
+
+        return {"applied": applied, "duplicates": duplicates, "rejected": rejected}
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/calendar.ics":
+            self._reply(404, {"error": "not found"})
+            return
+
+        body, etag, last_modified = self.server.feed.document()
+        not_modified = self.headers.get("If-None-Match") == etag
+        if not not_modified and "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since"):
+            try:
+                not_modified = parsedate_to_datetime(self.headers["If-Modified-Since"]) >= last_modified
+            except (TypeError, ValueError):
+                pass
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", format_datetime(last_modified, usegmt=True))
+        self.send_header("Cache-Control", "public, max-age=60")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/kills":
+            self._reply(404, {"error": "not found"})
+            return
+        token = self.server.token
+        if not token:
+            self._reply(403, {"error": "kill API disabled: set KILL_API_TOKEN"})
+            return
+        if self.headers.get("Authorization", "") != f"Bearer {token}":
+            self._reply(401, {"error": "unauthorized"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"error": "bad Content-Length"})
+            return
+        if length > KILL_API_MAX_BODY:
+            self._reply(413, {"error": f"body larger than {KILL_API_MAX_BODY} bytes"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+        except (ValueError, json.JSONDecodeError):
+            self._reply(400, {"error": "body must be JSON"})
+            return
+
+        # accept {"kills": [...]}, a bare list, or a single report
+        if isinstance(payload, dict) and "kills" in payload:
+            payload = payload["kills"]
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list):
+            self._reply(400, {"error": "expected a list of kill reports"})
+            return
+
+        try:
+            result = self.server.ingestor.ingest(payload)
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+            return
+        self._reply(200, result)
+
+    def log_message(self, format, *args):
+        pass  # keep the Streamlit console quiet
+
+
+def start_api(ingestor: KillIngestor, feed: "CalendarFeed", host: str = API_HOST, port: int = API_PORT,
+              token: str = KILL_API_TOKEN) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _ApiHandler)
+    server.ingestor = ingestor
+    server.feed = feed
+    server.token = token
+    threading.Thread(target=server.serve_forever, name="local-api", daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def get_api():
+    if not API_PORT:
+        return None
+    try:
+        return start_api(KillIngestor(), CalendarFeed())
+    except OSError:
+        return None  # port taken (e.g. another server process already owns the API)
 
 
 # ------------------- Weekly Boss Data -------------------
@@ -219,8 +970,8 @@ weekly_boss_data = [
 ]
 
 
-def get_next_weekly_spawn(day_time: str) -> datetime:
-    now = now_manila()
+def get_next_weekly_spawn(day_time: str, now: datetime = None) -> datetime:
+    now = now or now_manila()
     day_time = " ".join(day_time.split())
     day, time_str = day_time.split(" ", 1)
     target_time = datetime.strptime(time_str, "%H:%M").time()
@@ -246,7 +997,7 @@ def _warn_key(source: str, boss_name: str, spawn_dt: datetime, target_name: str)
     return f"{source}|{boss_name}|{spawn_dt.strftime('%Y-%m-%d %H:%M')}|{target_name}"
 
 
-def _claim_warn_key(warn_sent: dict, key: str) -> bool:
+def _claim_warn_key(warn_sent: dict, key: str, warn_file: Path = None) -> bool:
     """
     Claim the key BEFORE sending (helps avoid duplicates across multiple open sessions).
     Returns True if we successfully claimed it (it was not set yet).
@@ -254,13 +1005,21 @@ def _claim_warn_key(warn_sent: dict, key: str) -> bool:
     if warn_sent.get(key, False):
         return False
     warn_sent[key] = True
-    save_warn_sent(warn_sent)  # save immediately so other sessions see it
+    save_warn_sent(warn_sent, warn_file)  # save immediately so other sessions see it
     return True
 
 
-def send_5min_warnings(field_timers):
+def send_5min_warnings(field_timers, warn_file: Path = None, post=None) -> list:
+    """
+    warn_file: claim file to use instead of WARN_FILE (the simulator uses a temp file)
+    post: function(webhook_url, payload) -> bool, defaults to _post_webhook
+    Returns: list of warn keys claimed during this call
+    """
     now = now_manila()
-    warn_sent = load_warn_sent()
+    warn_sent = load_warn_sent(warn_file)
+    if post is None:
+        post = _post_webhook
+    sent = []
 
     # -------- FIELD BOSSES --------
     for t in field_timers:
@@ -285,12 +1044,13 @@ def send_5min_warnings(field_timers):
                 key = _warn_key("FIELD", t.name, spawn_dt, target_name)
 
                 # skip if already sent (per-target)
-                if not _claim_warn_key(warn_sent, key):
+                if not _claim_warn_key(warn_sent, key, warn_file):
                     continue
 
                 # send to that single target
                 msg = build_msg(target)
-                ok = _post_webhook(target.get("webhook", ""), {"content": msg})
+                ok = post(target.get("webhook", ""), {"content": msg})
+                sent.append(key)
 
                 # If you WANT retries on failure, uncomment this block.
                 # If you prefer "never duplicate ever", keep it commented.
@@ -322,25 +1082,235 @@ def send_5min_warnings(field_timers):
                     target_name = target.get("name", "unknown")
                     key = _warn_key("WEEKLY", boss, spawn_dt, target_name)
 
-                    if not _claim_warn_key(warn_sent, key):
+                    if not _claim_warn_key(warn_sent, key, warn_file):
                         continue
 
                     msg = build_msg(target)
-                    ok = _post_webhook(target.get("webhook", ""), {"content": msg})
+                    ok = post(target.get("webhook", ""), {"content": msg})
+                    sent.append(key)
 
                     # retries (optional)
                     # if not ok:
                     #     warn_sent.pop(key, None)
                     #     save_warn_sent(warn_sent)
 
+    return sent
 
-# ------------------- Banner -------------------
-def next_boss_banner_combined(field_timers):
-    if not field_timers:
-        st.warning("No timers loaded.")
-        return
 
-    now = now_manila()
+# ------------------- Schedule Simulator -------------------
+def simulate_schedule(days: int = 30, start: datetime = None, field_timers=None) -> dict:
+    """
+    Fast-forward the field timers and weekly_boss_data over `days` days on a
+    SimulatedClock. Every warning window is probed at its first and last second
+    through the real claim path (on a temp warn file); posts are counted instead
+    of sent, and every warn key claimed is tallied per (source, boss, spawn, target).
+    Returns a report with counts and every boss that got zero or duplicate warnings.
+    """
+    start = start or now_manila()
+    end = start + timedelta(days=days)
+    timers = copy.deepcopy(field_timers if field_timers is not None else build_timers())
+    window = timedelta(seconds=WARNING_WINDOW_SECONDS)
+    one_sec = timedelta(seconds=1)
+
+    clock = SimulatedClock(start)
+    previous = set_clock(clock)
+    try:
+        for t in timers:
+            t.update_next()
+
+        expected = []  # (source, boss, spawn_dt)
+        for t in timers:
+            spawn = t.next_time
+            while spawn <= end:
+                expected.append(("FIELD", t.name, spawn))
+                spawn += timedelta(seconds=t.interval_seconds)
+        for boss, times in weekly_boss_data:
+            for sched in times:
+                spawn = get_next_weekly_spawn(sched)
+                while spawn <= end:
+                    expected.append(("WEEKLY", boss, spawn))
+                    spawn += timedelta(days=7)
+        expected = [e for e in expected if e[2] > start]
+
+        ticks = set()
+        for _, _, spawn in expected:
+            ticks.add(max(spawn - window + one_sec, start))
+            ticks.add(spawn - one_sec)
+
+        messages = 0
+
+        def count_post(webhook_url: str, payload: dict) -> bool:
+            nonlocal messages
+            messages += 1
+            return True
+
+        # every call reloads the warn file, so a claim that didn't stick shows up
+        # as the same key coming back from a later call
+        sent_counts = Counter()
+
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            warn_file = Path(tmp) / "warn_sent.json"
+            for tick in sorted(ticks):
+                clock.set(tick)
+                for t in timers:
+                    t.update_next()
+                sent_counts.update(send_5min_warnings(timers, warn_file=warn_file, post=count_post))
+        elapsed = time.perf_counter() - started
+    finally:
+        set_clock(previous)
+
+    missing = []
+    for source, boss, spawn in expected:
+        for target in DISCORD_TARGETS:
+            key = _warn_key(source, boss, spawn, target.get("name", "unknown"))
+            if sent_counts[key] == 0:
+                missing.append(key)
+    duplicates = {key: n for key, n in sent_counts.items() if n > 1}
+    flagged = {key.split("|")[1] for key in missing} | {key.split("|")[1] for key in duplicates}
+
+    return {
+        "start": start.strftime("%Y-%m-%d %I:%M %p"),
+        "end": end.strftime("%Y-%m-%d %I:%M %p"),
+        "ticks": len(ticks),
+        "spawns": len(expected),
+        "warnings": len({key.rsplit("|", 1)[0] for key in sent_counts}),
+        "messages": messages,
+        "missing": missing,
+        "duplicates": duplicates,
+        "flagged_bosses": sorted(flagged),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+# ------------------- iCalendar Feed -------------------
+def _ics_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_events(source: str, boss_name: str, spawns, description: str, stamp: datetime) -> str:
+    slug = "-".join("".join(c if c.isalnum() else " " for c in boss_name.lower()).split())
+    lines = []
+    for spawn_dt in spawns:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{source.lower()}-{slug}-{spawn_dt.strftime('%Y%m%dT%H%M')}@boss-timer",
+            f"DTSTAMP:{_ics_utc(stamp)}",
+            f"DTSTART:{_ics_utc(spawn_dt)}",
+            f"DTEND:{_ics_utc(spawn_dt + timedelta(minutes=15))}",
+            f"SUMMARY:{_ics_escape(boss_name)} spawn",
+            f"DESCRIPTION:{_ics_escape(description)}",
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            f"DESCRIPTION:{_ics_escape(boss_name)} spawns in 5 minutes",
+            "TRIGGER:-PT5M",
+            "END:VALARM",
+            "END:VEVENT",
+        ]
+    return "".join(line + "\r\n" for line in lines)
+
+
+class CalendarFeed:
+    """
+    .ics of upcoming spawns from today over CALENDAR_HORIZON_DAYS.
+    Event text is cached per boss and only rebuilt when that boss's record
+    version (or the day) changes; the whole document is cached per board version.
+    """
+
+    def __init__(self, horizon_days: int = CALENDAR_HORIZON_DAYS):
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._fragments = {}  # (source, boss) -> (cache_key, text)
+        self._doc_key = None
+        self._doc = None  # (body, etag, last_modified)
+
+    def _fragment(self, source: str, boss_name: str, cache_key, build) -> str:
+        cached = self._fragments.get((source, boss_name))
+        if cached is None or cached[0] != cache_key:
+            cached = (cache_key, build())
+            self._fragments[(source, boss_name)] = cached
+        return cached[1]
+
+    def document(self):
+        """Returns (body_bytes, etag, last_modified)."""
+        store = get_board_store()
+        now = now_manila()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon_end = day_start + timedelta(days=self.horizon_days)
+
+        version = store.refresh()  # the API may live in a process nobody reruns in
+
+        with self._lock:
+            doc_key = (version, day_start)
+            if self._doc is not None and self._doc_key == doc_key:
+                return self._doc
+
+            parts = []
+            rows = store.rows()
+            for row in rows:
+                timer = TimerEntry(*row)
+
+                def build_field(timer=timer):
+                    step = timedelta(seconds=timer.interval_seconds)
+                    spawn = timer.next_time
+                    if spawn < day_start:
+                        spawn += step * ((day_start - spawn) // step)
+                    spawns = []
+                    while spawn < horizon_end:
+                        if spawn >= day_start:
+                            spawns.append(spawn)
+                        spawn += step
+                    return _ics_events("FIELD", timer.name, spawns,
+                                       f"Field boss, every {timer.interval_minutes} min", now)
+
+                parts.append(self._fragment("FIELD", timer.name, (row[3], row[2], day_start), build_field))
+
+            for boss, times in weekly_boss_data:
+                def build_weekly(boss=boss, times=times):
+                    spawns = []
+                    for sched in times:
+                        spawn = get_next_weekly_spawn(sched, now=day_start - timedelta(seconds=1))
+                        while spawn < horizon_end:
+                            spawns.append(spawn)
+                            spawn += timedelta(days=7)
+                    return _ics_events("WEEKLY", boss, sorted(spawns), "Weekly boss", now)
+
+                parts.append(self._fragment("WEEKLY", boss, day_start, build_weekly))
+
+            # drop bosses that left the board
+            live = {("FIELD", row[0]) for row in rows} | {("WEEKLY", boss) for boss, _ in weekly_boss_data}
+            for key in list(self._fragments):
+                if key not in live:
+                    del self._fragments[key]
+
+            body = (
+                "BEGIN:VCALENDAR\r\n"
+                "VERSION:2.0\r\n"
+                "PRODID:-//Lord9 Santiago 7//Boss Timer//EN\r\n"
+                "CALSCALE:GREGORIAN\r\n"
+                "X-WR-CALNAME:Lord9 Santiago 7 Boss Spawns\r\n"
+                "X-WR-TIMEZONE:Asia/Manila\r\n"
+                + "".join(parts)
+                + "END:VCALENDAR\r\n"
+            ).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+            if self._doc is not None and self._doc[1] == etag:
+                self._doc_key = doc_key  # same content, keep the old Last-Modified
+                return self._doc
+
+            # HTTP dates are UTC with whole-second precision
+            self._doc = (body, etag, now.astimezone(timezone.utc).replace(microsecond=0))
+            self._doc_key = doc_key
+            return self._doc
+
+
+# ------------------- Banner -------------------
+def _banner_html(field_timers, now: datetime) -> str:
     field_next = min(field_timers, key=lambda x: x.next_time)
     field_cd = field_next.next_time - now
 
@@ -349,7 +1319,7 @@ def next_boss_banner_combined(field_timers):
     weekly_best_cd = None
     for boss, times in weekly_boss_data:
         for sched in times:
-            spawn_dt = get_next_weekly_spawn(sched)
+            spawn_dt = get_next_weekly_spawn(sched, now=now)
             cd = spawn_dt - now
             if weekly_best_cd is None or cd < weekly_best_cd:
                 weekly_best_cd = cd
@@ -375,8 +1345,7 @@ def next_boss_banner_combined(field_timers):
     time_only = chosen_time.strftime("%I:%M %p")
     cd_str = format_timedelta(chosen_cd)
 
-    st.markdown(
-        f"""
+    return f"""
         <style>
         .banner-container {{
             display: flex;
@@ -429,25 +1398,33 @@ def next_boss_banner_combined(field_timers):
                 </div>
             </div>
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def next_boss_banner_combined(field_timers, html: str = None):
+    """html: prebuilt banner from the shared tick render (World page)."""
+    if not field_timers:
+        st.warning("No timers loaded.")
+        return
+
+    st.markdown(html or _banner_html(field_timers, now_manila()), unsafe_allow_html=True)
 
 
 # ------------------- Tables -------------------
-def display_boss_table_sorted_newstyle(timers_list):
+def _field_table_html(timers_list, now: datetime) -> str:
     timers_sorted = sorted(timers_list, key=lambda t: t.next_time)
 
     countdown_cells = []
     for t in timers_sorted:
-        secs = t.countdown().total_seconds()
+        countdown = t.next_time - now
+        secs = countdown.total_seconds()
         if secs <= 60:
             color = "red"
         elif secs <= 300:
             color = "orange"
         else:
             color = "green"
-        countdown_cells.append(f"<span style='color:{color}'>{format_timedelta(t.countdown())}</span>")
+        countdown_cells.append(f"<span style='color:{color}'>{format_timedelta(countdown)}</span>")
 
     data = {
         "Boss Name": [t.name for t in timers_sorted],
@@ -458,8 +1435,11 @@ def display_boss_table_sorted_newstyle(timers_list):
         "Countdown": countdown_cells,
     }
 
-    df = pd.DataFrame(data)
+    return pd.DataFrame(data).to_html(escape=False, index=False)
+
 
+def display_boss_table_sorted_newstyle(timers_list, html: str = None):
+    """html: prebuilt table from the shared tick render (World page)."""
     st.markdown("""
     <style>
     table th {
@@ -479,15 +1459,14 @@ def display_boss_table_sorted_newstyle(timers_list):
     </style>
     """, unsafe_allow_html=True)
 
-    st.write(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+    st.write(html or _field_table_html(timers_list, now_manila()), unsafe_allow_html=True)
 
 
-def display_weekly_boss_table_newstyle():
-    now = now_manila()
+def _weekly_table_html(now: datetime) -> str:
     upcoming = []
     for boss, times in weekly_boss_data:
         for sched in times:
-            spawn_dt = get_next_weekly_spawn(sched)
+            spawn_dt = get_next_weekly_spawn(sched, now=now)
             countdown = spawn_dt - now
             upcoming.append((boss, spawn_dt, countdown))
 
@@ -502,13 +1481,213 @@ def display_weekly_boss_table_newstyle():
             for row in upcoming_sorted
         ],
     }
-    df = pd.DataFrame(data)
-    st.write(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+    return pd.DataFrame(data).to_html(escape=False, index=False)
+
+
+def display_weekly_boss_table_newstyle(html: str = None):
+    """html: prebuilt table from the shared tick render (World page)."""
+    st.write(html or _weekly_table_html(now_manila()), unsafe_allow_html=True)
+
+
+# ------------------- Shared Tick Render (World page) -------------------
+class TickRenderCache:
+    """
+    Keeps only the newest rendered tick, keyed by (board version, wall-clock second).
+    The first session to reach a tick builds it; sessions arriving meanwhile wait
+    for that build instead of starting their own.
+    """
+
+    def __init__(self, wait_seconds: float = 1.0):
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._key = None
+        self._value = None
+        self._building = {}  # key -> threading.Event
+        self.builds = 0
+
+    def get(self, key, build):
+        with self._lock:
+            if self._key == key:
+                return self._value
+            event = self._building.get(key)
+            owner = event is None
+            if owner:
+                event = self._building[key] = threading.Event()
+
+        if not owner:
+            event.wait(self.wait_seconds)
+            with self._lock:
+                if self._key == key:
+                    return self._value
+            return build()  # builder failed or took too long, don't leave this viewer blank
+
+        try:
+            value = build()
+            with self._lock:
+                self.builds += 1
+                # never let a slow build for an older tick replace a newer one
+                if self._key is None or key[1] >= self._key[1]:
+                    self._key = key
+                    self._value = value
+            return value
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+            event.set()
+
+
+@st.cache_resource
+def get_tick_render_cache() -> TickRenderCache:
+    return TickRenderCache()
+
+
+def world_tick_fragments() -> dict:
+    """Banner + table HTML for the current second, built once per server and shared by every viewer."""
+    store = get_board_store()
+    now = now_manila().replace(microsecond=0)
+
+    def build():
+        field_timers = [TimerEntry(*row) for row in store.rows()]
+        for t in field_timers:
+            t.update_next(now)
+        return {
+            "banner": _banner_html(field_timers, now) if field_timers else None,
+            "field": _field_table_html(field_timers, now),
+            "weekly": _weekly_table_html(now),
+        }
+
+    return get_tick_render_cache().get((store.version, int(now.timestamp())), build)
+
+
+# ------------------- Rerun Profiler -------------------
+class RerunProfiler:
+    """
+    Server-wide switch for cProfile capture of whole reruns.
+    Armed for the next N reruns (any session) and/or until a deadline; when
+    disarmed, start() is a single check. Finished captures live in a ring buffer.
+    Only one rerun is captured at a time (Python 3.12+ allows a single active
+    profiler per interpreter); reruns that start meanwhile are simply not profiled.
+    On 3.12+ (PROFILE_SERVER_WIDE) a capture also includes every other thread, so
+    "page" only says which rerun opened it.
+    """
+
+    def __init__(self, ring_size: int = PROFILE_RING_SIZE):
+        self._lock = threading.Lock()
+        self.runs_left = 0
+        self.until = 0.0  # time.monotonic() deadline
+        self.captures = deque(maxlen=ring_size)
+        self._active = None  # (profile, page) of the capture in progress
+
+    @property
+    def armed(self) -> bool:
+        return self.runs_left > 0 or time.monotonic() < self.until
+
+    def arm(self, runs: int = 0, seconds: float = 0):
+        with self._lock:
+            self.runs_left = max(self.runs_left, int(runs))
+            if seconds:
+                self.until = max(self.until, time.monotonic() + seconds)
+
+    def disarm(self):
+        with self._lock:
+            self.runs_left = 0
+            self.until = 0.0
+
+    def clear(self):
+        with self._lock:
+            self.captures.clear()
+
+    def start(self, page: str):
+        if not self.armed:
+            return None
+        with self._lock:
+            if self._active is not None:
+                return None
+            if self.runs_left <= 0 and time.monotonic() >= self.until:
+                return None
+
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                return None  # another profiling tool is already active
+            if self.runs_left > 0:
+                self.runs_left -= 1
+            self._active = (prof, page)
+
+        # close the capture once the script thread ends, even if the script raised
+        # and no further rerun comes to close it
+        owner = threading.current_thread()
+        threading.Thread(target=self._finish_after, args=(owner, prof), name="profiler-reaper", daemon=True).start()
+        return prof
+
+    def _finish_after(self, owner: threading.Thread, prof: cProfile.Profile):
+        owner.join()
+        self.finish(prof)
+
+    def finish(self, prof: cProfile.Profile):
+        """Close a capture started by start(). Safe to call more than once."""
+        with self._lock:
+            if self._active is None or self._active[0] is not prof:
+                return
+            page = self._active[1]
+            self._active = None
+            prof.disable()
+            prof.create_stats()
+            self.captures.append({
+                "at": now_manila(),
+                "page": page,
+                "seconds": sum(tt for _, _, tt, _, _ in prof.stats.values()),
+                "profile": prof,
+            })
+
+    def stats(self, page: str = None):
+        """pstats.Stats merged over the buffered captures (optionally one page), or None."""
+        with self._lock:
+            profiles = [c["profile"] for c in self.captures if page is None or c["page"] == page]
+        if not profiles:
+            return None
+        merged = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            merged.add(prof)
+        return merged
+
+
+def hotspot_rows(stats: pstats.Stats) -> list:
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "Function": func,
+            "Location": f"{Path(filename).name}:{line}" if line else filename,
+            "Calls": nc,
+            "Own (ms)": round(tt * 1000, 3),
+            "Total (ms)": round(ct * 1000, 3),
+            "Per call (µs)": round(tt / nc * 1e6, 2) if nc else 0.0,
+        })
+    rows.sort(key=lambda r: r["Own (ms)"], reverse=True)
+    return rows
+
+
+def pstats_bytes(stats: pstats.Stats) -> bytes:
+    # same format Stats.dump_stats writes, so snakeviz / gprof2dot / flameprof can open it
+    return marshal.dumps(stats.stats)
+
+
+@st.cache_resource
+def get_profiler() -> RerunProfiler:
+    return RerunProfiler()
+
+
+def finish_rerun_profile():
+    """Close this session's open capture, if any (called at both ends of a rerun)."""
+    pending = st.session_state.pop("profile_run", None)
+    if pending:
+        get_profiler().finish(pending)
 
 
 # ------------------- UI Helpers -------------------
 def admin_nav(active_page: str):
-    c1, c2, c3, c4, c5, c6 = st.columns([1.2, 1.2, 1.2, 1.2, 1.2, 2.0])
+    c1, c2, c3, c4, c5, c6, c7 = st.columns([1.2, 1.2, 1.2, 1.2, 1.2, 1.2, 2.0])
 
     with c1:
         if st.button("⏱️ Boss Tracker", use_container_width=True):
@@ -523,10 +1702,38 @@ def admin_nav(active_page: str):
         if st.button("📜 History", use_container_width=True):
             goto("history")
     with c5:
+        if st.button("📈 Profiler", use_container_width=True):
+            goto("profiler")
+    with c6:
         if st.button("🚪 Logout", use_container_width=True):
             logout_and_go_world()
-    with c6:
+    with c7:
         st.success(f"Admin: {st.session_state.username}")
+        st.caption(save_status())
+        if get_writer().is_pending():
+            # admin pages don't auto-refresh; rerun until the write lands so the caption flips to saved
+            st_autorefresh(interval=300, key="save_status_refresh")
+
+
+# ------------------- Simulator CLI -------------------
+# python timer_app_streamlit2.py [days] -> fast-forward the schedule without the UI
+if __name__ == "__main__" and not st.runtime.exists():
+    sim_days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    report = simulate_schedule(sim_days)
+    print(json.dumps(report, indent=4))
+    sys.exit(1 if report["flagged_bosses"] else 0)
+
+
+def seen_version(timer) -> int:
+    """
+    Version of this boss the admin had on screen before this rerun.
+    The rerun that handles a click has already synced newer records, so the
+    click must be checked against what was rendered, not what is loaded now.
+    """
+    seen = st.session_state.seen_versions
+    expected = seen.get(timer.name, timer.version)
+    seen[timer.name] = timer.version
+    return expected
 
 
 # ------------------- Streamlit Setup -------------------
@@ -559,18 +1766,35 @@ div.stButton > button:active{
 # ------------------- Session defaults -------------------
 st.session_state.setdefault("auth", False)
 st.session_state.setdefault("username", "")
-st.session_state.setdefault("page", "world")  # world | login | manage | history | instakill
+st.session_state.setdefault("page", "world")  # world | login | manage | history | instakill | profiler
 st.session_state.setdefault("manage_saved_msgs", {})
+st.session_state.setdefault("manage_conflict_msgs", {})
+st.session_state.setdefault("seen_versions", {})
+st.session_state.setdefault("board_version", -1)  # -1 = never synced, e.g. timers kept across a hot reload
 st.session_state.setdefault("ik_toast", None)
 
 
+# ------------------- Rerun profiling (admin toggle) -------------------
+# st.rerun() skips the end of the script, so a capture left open by the
+# previous rerun of this session is closed here first.
+finish_rerun_profile()
+if st.session_state.page != "profiler":
+    _rerun_profile = get_profiler().start(st.session_state.page)
+    if _rerun_profile is not None:
+        st.session_state.profile_run = _rerun_profile
+
+
 def goto(page_name: str):
     if st.session_state.page == "manage" and page_name != "manage":
         st.session_state.manage_saved_msgs = {}
+        st.session_state.manage_conflict_msgs = {}
     st.session_state.page = page_name
     st.rerun()
 
 
+get_api()
+
+
 # ------------------- Auto-refresh ONLY on World page -------------------
 if st.session_state.page == "world":
     st_autorefresh(interval=1000, key="timer_refresh")
@@ -579,6 +1803,10 @@ if st.session_state.page == "world":
 # ------------------- Load timers -------------------
 if "timers" not in st.session_state:
     st.session_state.timers = build_timers()
+    st.session_state.board_version = get_board_store().version
+
+if st.session_state.board_version != get_board_store().refresh():
+    st.session_state.board_version = sync_timers(st.session_state.timers)
 
 timers = st.session_state.timers
 for t in timers:
@@ -590,6 +1818,7 @@ if st.session_state.page == "world":
 
 # ------------------- WORLD PAGE HEADER -------------------
 if st.session_state.page == "world":
+    world_tick = world_tick_fragments()
     left_btn, mid_banner, right_space = st.columns([2, 6, 2])
 
     with left_btn:
@@ -601,7 +1830,7 @@ if st.session_state.page == "world":
                 goto("manage")
 
     with mid_banner:
-        next_boss_banner_combined(timers)
+        next_boss_banner_combined(timers, html=world_tick["banner"])
 else:
     next_boss_banner_combined(timers)
 
@@ -614,10 +1843,12 @@ if st.session_state.page == "world":
 
     col1, col2 = st.columns([2, 1])
     with col1:
-        display_boss_table_sorted_newstyle(timers)
+        display_boss_table_sorted_newstyle(timers, html=world_tick["field"])
     with col2:
         st.subheader("📅 Weekly Boss Spawns (Auto-Sorted)")
-        display_weekly_boss_table_newstyle()
+        display_weekly_boss_table_newstyle(html=world_tick["weekly"])
+        if CALENDAR_FEED_URL:
+            st.caption(f"📆 Get spawns in your calendar instead of keeping this tab open: {CALENDAR_FEED_URL}")
 
 
 # ------------------- LOGIN PAGE -------------------
@@ -671,25 +1902,32 @@ elif st.session_state.page == "manage":
                     step=60,
                 )
 
-                if st.button(f"Save {timer.name}", key=f"save_{timer.name}"):
+                save_clicked = st.button(f"Save {timer.name}", key=f"save_{timer.name}")
+                expected_version = seen_version(timer)
+
+                if save_clicked:
                     old_time_str = timer.last_time.strftime("%Y-%m-%d %I:%M %p")
 
                     updated_last_time = datetime.combine(new_date, new_time).replace(tzinfo=MANILA)
-                    updated_next_time = updated_last_time + timedelta(seconds=timer.interval_seconds)
-
-                    st.session_state.timers[i].last_time = updated_last_time
-                    st.session_state.timers[i].next_time = updated_next_time
-
-                    save_boss_data([
-                        (t.name, t.interval_minutes, t.last_time.strftime("%Y-%m-%d %I:%M %p"))
-                        for t in st.session_state.timers
-                    ])
-
-                    log_edit(timer.name, old_time_str, updated_last_time.strftime("%Y-%m-%d %I:%M %p"))
-
-                    st.session_state.manage_saved_msgs[timer.name] = (
-                        f"✅ {timer.name} updated! Next: {updated_next_time.strftime('%Y-%m-%d %I:%M %p')}"
-                    )
+                    updated_last_str = updated_last_time.strftime("%Y-%m-%d %I:%M %p")
+
+                    ok, record = get_board_store().compare_and_set(timer.name, expected_version, updated_last_str)
+                    st.session_state.timers[i] = TimerEntry(*record)
+                    st.session_state.seen_versions[timer.name] = record[3]
+
+                    if ok:
+                        log_edit(timer.name, old_time_str, updated_last_str)
+                        st.session_state.manage_conflict_msgs.pop(timer.name, None)
+                        st.session_state.manage_saved_msgs[timer.name] = (
+                            f"✅ {timer.name} updated! "
+                            f"Next: {st.session_state.timers[i].next_time.strftime('%Y-%m-%d %I:%M %p')}"
+                        )
+                    else:
+                        st.session_state.manage_saved_msgs.pop(timer.name, None)
+                        st.session_state.manage_conflict_msgs[timer.name] = (
+                            f"⚠️ {timer.name} was changed by another admin (last: {record[2]}). "
+                            f"Your change was NOT saved — review and save again."
+                        )
 
                     st.rerun()
 
@@ -697,6 +1935,10 @@ elif st.session_state.page == "manage":
                 if msg:
                     st.success(msg)
 
+                conflict = st.session_state.manage_conflict_msgs.get(timer.name)
+                if conflict:
+                    st.error(conflict)
+
 
 # ------------------- HISTORY PAGE -------------------
 elif st.session_state.page == "history":
@@ -709,15 +1951,10 @@ elif st.session_state.page == "history":
 
         st.subheader("📜 Edit History")
 
-        if HISTORY_FILE.exists():
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                history = json.load(f)
-
-            if history:
-                df_history = pd.DataFrame(history).sort_values("edited_at", ascending=False)
-                st.dataframe(df_history, use_container_width=True)
-            else:
-                st.info("No edits yet.")
+        history = load_history()
+        if history:
+            df_history = pd.DataFrame(history).sort_values("edited_at", ascending=False)
+            st.dataframe(df_history, use_container_width=True)
         else:
             st.info("No edit history yet.")
 
@@ -805,6 +2042,7 @@ elif st.session_state.page == "instakill":
                     )
 
                     clicked = st.button("Killed Now", key=f"ik_{t.name}", use_container_width=True)
+                    expected_version = seen_version(t)
 
                     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -812,33 +2050,38 @@ elif st.session_state.page == "instakill":
                         old_time_str = t.last_time.strftime("%Y-%m-%d %I:%M %p")
 
                         updated_last = now_manila()
-                        updated_next = updated_last + timedelta(seconds=t.interval_seconds)
-
-                        killer = st.session_state.get("username", "Unknown")
-                        spawn_str = updated_next.strftime("%B %d, %Y | %I:%M %p")
+                        updated_last_str = updated_last.strftime("%Y-%m-%d %I:%M %p")
 
-                        msg = (
-                            f"💀 **{t.name}** has been killed.\n"
-                            f"Next spawn: **{spawn_str}** (Manila Time)\n"
-                            f"Updated by {killer}"
-                        )
-
-                        # send to each Discord target once
-                        for target in DISCORD_TARGETS:
-                            _post_webhook(target.get("webhook", ""), {"content": msg})
+                        ok, record = get_board_store().compare_and_set(t.name, expected_version, updated_last_str)
+                        entry = TimerEntry(*record)
 
                         for idx, obj in enumerate(st.session_state.timers):
                             if obj.name == t.name:
-                                st.session_state.timers[idx].last_time = updated_last
-                                st.session_state.timers[idx].next_time = updated_next
+                                st.session_state.timers[idx] = entry
                                 break
+                        st.session_state.seen_versions[t.name] = record[3]
+
+                        if not ok:
+                            st.session_state.ik_toast = {
+                                "msg": (
+                                    f"⚠️ {t.name} was already updated by another admin (last: {record[2]}). "
+                                    f"Kill NOT recorded — check the board and try again."
+                                ),
+                                "ts": now_manila(),
+                                "error": True,
+                            }
+                            st.rerun()
+
+                        updated_next = entry.next_time
+
+                        killer = st.session_state.get("username", "Unknown")
+                        msg = _kill_message(t.name, updated_next, killer)
 
-                        save_boss_data([
-                            (x.name, x.interval_minutes, x.last_time.strftime("%Y-%m-%d %I:%M %p"))
-                            for x in st.session_state.timers
-                        ])
+                        # send to each Discord target once
+                        for target in DISCORD_TARGETS:
+                            _post_webhook(target.get("webhook", ""), {"content": msg})
 
-                        log_edit(t.name, old_time_str, updated_last.strftime("%Y-%m-%d %I:%M %p"))
+                        log_edit(t.name, old_time_str, updated_last_str)
 
                         st.session_state.ik_toast = {
                             "msg": f"✅ {t.name} updated! Next: {updated_next.strftime('%Y-%m-%d %I:%M %p')}",
@@ -851,10 +2094,93 @@ elif st.session_state.page == "instakill":
             toast = st.session_state.ik_toast
             age = (now_manila() - toast["ts"]).total_seconds()
 
-            st.success(toast["msg"])
+            if toast.get("error"):
+                st.error(toast["msg"])
+            else:
+                st.success(toast["msg"])
             st_autorefresh(interval=500, key="ik_refresh")
 
             if age >= 2.5:
                 st.session_state.ik_toast = None
                 st.rerun()
 
+
+# ------------------- PROFILER PAGE -------------------
+elif st.session_state.page == "profiler":
+    if not st.session_state.auth:
+        st.warning("You must login first.")
+        if st.button("Go to Login", use_container_width=True):
+            goto("login")
+    else:
+        admin_nav("profiler")
+
+        st.subheader("📈 Profiler")
+        st.caption("Captures cProfile data for whole reruns across every session. Off = no overhead.")
+        if PROFILE_SERVER_WIDE:
+            st.caption(
+                "On this Python (3.12+) each capture records every thread of the server while the rerun "
+                "is running, including other sessions and background writers, so captures are not split by page."
+            )
+
+        profiler = get_profiler()
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            runs = st.number_input("Reruns to capture", min_value=1, max_value=1000, value=50, step=10)
+            if st.button("▶️ Capture next reruns", use_container_width=True):
+                profiler.arm(runs=runs)
+                st.rerun()
+        with c2:
+            seconds = st.number_input("Seconds to capture", min_value=5, max_value=3600, value=60, step=15)
+            if st.button("⏱️ Capture for window", use_container_width=True):
+                profiler.arm(seconds=seconds)
+                st.rerun()
+        with c3:
+            st.write("")
+            if st.button("⏹️ Stop", use_container_width=True):
+                profiler.disarm()
+                st.rerun()
+            if st.button("🗑️ Clear captures", use_container_width=True):
+                profiler.clear()
+                st.rerun()
+
+        if profiler.armed:
+            left = max(0, int(profiler.until - time.monotonic()))
+            st.info(f"🔴 Capturing — {profiler.runs_left} reruns left, {left}s left in window.")
+        else:
+            st.success("⚪ Capture is off.")
+
+        captures = list(profiler.captures)
+        st.caption(f"{len(captures)} / {profiler.captures.maxlen} reruns buffered.")
+
+        if captures:
+            if PROFILE_SERVER_WIDE:
+                stats = profiler.stats()
+                page_col, time_col = "Started on", "Own time, all threads (ms)"
+            else:
+                pages = sorted({c["page"] for c in captures})
+                page_filter = st.selectbox("Page", ["All"] + pages)
+                stats = profiler.stats(None if page_filter == "All" else page_filter)
+                page_col, time_col = "Page", "Own time (ms)"
+
+            df_runs = pd.DataFrame([
+                {"At": c["at"].strftime("%H:%M:%S"), page_col: c["page"], time_col: round(c["seconds"] * 1000, 1)}
+                for c in captures
+            ])
+            with st.expander("Captured reruns", expanded=False):
+                st.dataframe(df_runs, use_container_width=True)
+
+            st.dataframe(pd.DataFrame(hotspot_rows(stats)), use_container_width=True, height=520)
+
+            st.download_button(
+                "⬇️ Download .pstats",
+                data=pstats_bytes(stats),
+                file_name=f"boss_timer_{now_manila().strftime('%Y%m%d_%H%M%S')}.pstats",
+                mime="application/octet-stream",
+                use_container_width=True,
+            )
+        else:
+            st.info("No captures yet.")
+
+
+finish_rerun_profile()